@@ -6,8 +6,8 @@ from flask import current_app
 from flask_sqlalchemy import SQLAlchemy
 
 from sqlalchemy.types import Integer, String, DateTime
-from sqlalchemy.schema import Table, Column, ForeignKey
-from sqlalchemy.orm import relationship, scoped_session, backref
+from sqlalchemy.schema import Table, Column, ForeignKey, Index
+from sqlalchemy.orm import relationship, scoped_session, backref, aliased
 
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -108,6 +108,12 @@ OrganizationRoleMixin = resource_role_class(
 
 
 class OrganizationRole(Base, OrganizationRoleMixin):
+    # The mixin's unique constraint already indexes (organization_id, user_id);
+    # add the reverse order for the viewer side of `visible_users`.
+    __table_args__ = OrganizationRoleMixin.__table_args__ + (
+        Index("ix_organization_roles_user_org", "user_id", "organization_id"),
+    )
+
     def repr(self):
         return {"id": self.id, "name": str(self.name)}
 
@@ -118,3 +124,27 @@ TeamRoleMixin = resource_role_class(Base, User, Team, ["MAINTAINER", "MEMBER"])
 class TeamRole(Base, TeamRoleMixin):
     def repr(self):
         return {"id": self.id, "name": str(self.name)}
+
+
+## QUERIES ##
+
+
+def visible_users(session, user, organization=None):
+    """Query for the users that `user` is allowed to see.
+
+    SQL version of the "users in the same organization" rule in
+    authorization.polar: a single self-join over OrganizationRole instead of
+    loading and intersecting both users' organizations in Python. Pass
+    `organization` to only return members of that organization.
+    """
+    viewer_role = aliased(OrganizationRole)
+    member_role = aliased(OrganizationRole)
+    query = (
+        session.query(User)
+        .join(member_role, member_role.user_id == User.id)
+        .join(viewer_role, viewer_role.organization_id == member_role.organization_id)
+        .filter(viewer_role.user_id == user.id)
+    )
+    if organization is not None:
+        query = query.filter(viewer_role.organization_id == organization.id)
+    return query.distinct()
@@ -2,11 +2,15 @@ from flask import Blueprint, g, request, current_app
 from flask_oso import authorize
 from .models import User, Organization, Team, Repository, Issue
 from .models import RepositoryRole, OrganizationRole, TeamRole
+from .models import visible_users
 
 from sqlalchemy_oso import roles as oso_roles
 
 bp = Blueprint("routes", __name__)
 
+MEMBERS_PER_PAGE = 50
+MAX_MEMBERS_PER_PAGE = 100
+
 
 @bp.route("/", methods=["GET"])
 def hello():
@@ -130,3 +134,27 @@ def org_roles_index(org_id):
     return {
         f"roles": [{"user": role.user.repr(), "role": role.repr()} for role in roles]
     }
+
+
+@bp.route("/orgs/<int:org_id>/members", methods=["GET"])
+def org_members_index(org_id):
+    org = g.basic_session.query(Organization).filter_by(id=org_id).first()
+    current_app.oso.authorize(org, actor=g.current_user, action="LIST_MEMBERS")
+
+    # Use `visible_users` rather than `g.auth_session`, whose partially
+    # evaluated `allow` rule loads the current user's organizations first and
+    # then cross-joins one OrganizationRole alias per organization
+    page = max(request.args.get("page", 1, type=int), 1)
+    per_page = request.args.get("per_page", MEMBERS_PER_PAGE, type=int)
+    per_page = min(max(per_page, 1), MAX_MEMBERS_PER_PAGE)
+    members = (
+        visible_users(g.basic_session, g.current_user, org)
+        .order_by(User.id)
+        .limit(per_page)
+        .offset((page - 1) * per_page)
+    )
+    return {
+        "members": [member.repr() for member in members],
+        "page": page,
+        "per_page": per_page,
+    }
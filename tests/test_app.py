@@ -1,8 +1,11 @@
 from .conftest import test_client, test_db_session
-from flask import json
+from flask import json, g, Flask
 import pytest
+from sqlalchemy.exc import IntegrityError
 
-from app.models import User, Repository, RepositoryRole
+from app import init_oso
+from app.models import User, Organization, Repository, RepositoryRole
+from app.models import OrganizationRole, visible_users
 
 
 def test_db_loads(test_db_session):
@@ -12,6 +15,49 @@ def test_db_loads(test_db_session):
     assert len(just_john) == 1
 
 
+def test_visible_users(test_db_session):
+    john = test_db_session.query(User).filter_by(email="john@beatles.com").one()
+    users = visible_users(test_db_session, john).order_by(User.id).all()
+    assert [user.email for user in users] == [
+        "john@beatles.com",
+        "paul@beatles.com",
+        "ringo@beatles.com",
+    ]
+
+    monsters = test_db_session.query(Organization).filter_by(id=2).one()
+    assert visible_users(test_db_session, john, monsters).all() == []
+
+
+def test_visible_users_matches_policy(test_db_session):
+    # Give one user roles in both organizations
+    randall = test_db_session.query(User).filter_by(email="randall@monsters.com").one()
+    beatles = test_db_session.query(Organization).filter_by(id=1).one()
+    test_db_session.add(
+        OrganizationRole(name="MEMBER", organization=beatles, user=randall)
+    )
+    test_db_session.commit()
+
+    app = Flask(__name__)
+    oso = init_oso(app)
+    users = test_db_session.query(User).all()
+    with app.app_context():
+        g.basic_session = test_db_session
+        for viewer in users:
+            visible = set(visible_users(test_db_session, viewer))
+            for target in users:
+                assert oso.is_allowed(viewer, "READ", target) == (target in visible)
+
+
+def test_org_role_unique_per_user(test_db_session):
+    john = test_db_session.query(User).filter_by(email="john@beatles.com").one()
+    beatles = test_db_session.query(Organization).filter_by(id=1).one()
+    test_db_session.add(
+        OrganizationRole(name="MEMBER", organization=beatles, user=john)
+    )
+    with pytest.raises(IntegrityError):
+        test_db_session.commit()
+
+
 def test_user(test_client):
     resp = test_client.get("/")
     assert resp.status_code == 401
@@ -185,3 +231,25 @@ def test_org_roles(test_client):
 
     resp = test_client.get("/orgs/2/roles", headers={"user": "john@beatles.com"})
     assert resp.status_code == 403
+
+
+def test_org_members(test_client):
+    resp = test_client.get("/orgs/1/members", headers={"user": "paul@beatles.com"})
+    assert resp.status_code == 200
+    members = json.loads(resp.data).get("members")
+    assert [member.get("email") for member in members] == [
+        "john@beatles.com",
+        "paul@beatles.com",
+        "ringo@beatles.com",
+    ]
+
+    resp = test_client.get(
+        "/orgs/1/members?per_page=2&page=2", headers={"user": "paul@beatles.com"}
+    )
+    assert resp.status_code == 200
+    members = json.loads(resp.data).get("members")
+    assert len(members) == 1
+    assert members[0].get("email") == "ringo@beatles.com"
+
+    resp = test_client.get("/orgs/2/members", headers={"user": "john@beatles.com"})
+    assert resp.status_code == 403